@@ -17,16 +17,43 @@ from pathlib import Path
 import numpy as np
 import pandas as pd
 import statsmodels.api as sm
-import statsmodels.formula.api as smf
+
+# First year of P1, P2, P3
+PERIOD_STARTS = np.array([1994, 2008, 2020])
 
 
 def _make_periods(df: pd.DataFrame, year_col: str = "YEAR") -> pd.DataFrame:
-    df = df.copy()
-    y = pd.to_numeric(df[year_col], errors="coerce")
-    df["P1"] = ((y >= 1994) & (y <= 2007)).astype(int)
-    df["P2"] = ((y >= 2008) & (y <= 2019)).astype(int)
-    df["P3"] = (y >= 2020).astype(int)
-    return df
+    """Return int8 P1/P2/P3 indicators aligned to df.index (df is not copied)."""
+    y = pd.to_numeric(df[year_col], errors="coerce").fillna(0).to_numpy()
+    # 0 = before 1994 or missing, 1..3 = P1..P3
+    period = np.searchsorted(PERIOD_STARTS, y, side="right")
+    return pd.DataFrame(
+        {f"P{k}": (period == k).astype(np.int8) for k in (1, 2, 3)}, index=df.index
+    )
+
+
+def _design_matrix(df: pd.DataFrame, fixed_effects: list[str]) -> pd.DataFrame:
+    """Build the DiD design matrix directly instead of going through patsy.
+
+    Columns: Intercept, is_parent, P2, P3, is_parent:P2, is_parent:P3, then
+    drop-first dummies for each fixed effect named like patsy's C(col)[T.level].
+    """
+    X = df[["is_parent", "P2", "P3"]].astype(float)
+    X["is_parent:P2"] = X["is_parent"] * X["P2"]
+    X["is_parent:P3"] = X["is_parent"] * X["P3"]
+    dummies = [
+        pd.get_dummies(
+            df[c],
+            prefix=f"C({c})[T",
+            prefix_sep=".",
+            drop_first=True,
+            dtype=float,
+        ).rename(columns=lambda name: f"{name}]")
+        for c in fixed_effects
+    ]
+    X = pd.concat([X, *dummies], axis=1)
+    X.insert(0, "Intercept", 1.0)
+    return X
 
 
 def run_monthlevel_ols(rates: pd.DataFrame) -> str:
@@ -34,30 +61,45 @@ def run_monthlevel_ols(rates: pd.DataFrame) -> str:
 
     Input columns: YEAR, MONTH, is_parent, rate
     """
-    df = _make_periods(rates)
+    df = pd.concat([rates, _make_periods(rates)], axis=1)
     # Reshape to have parent/non-parent columns to construct gap if needed
     # But DiD spec can be done directly with is_parent * periods
     df["month_id"] = (df["YEAR"].astype(int) * 12 + df["MONTH"].astype(int))
-    model = smf.ols(
-        formula="rate ~ is_parent * (P2 + P3) + C(MONTH)",
-        data=df,
-    ).fit(cov_type="cluster", cov_kwds={"groups": df["month_id"]})
+    X = _design_matrix(df, ["MONTH"])
+    model = sm.OLS(df["rate"].astype(float), X).fit(
+        cov_type="cluster", cov_kwds={"groups": df["month_id"]}
+    )
     return model.summary().as_text()
 
 
+def _fit_person_glm(micro: pd.DataFrame):
+    """Fit the person-month Binomial GLM; see run_person_glm for inputs."""
+    periods = _make_periods(micro)
+    # Covariates are all categorical, so collapse person-months to one
+    # (successes, failures) row per covariate pattern. Point estimates are
+    # unchanged; state-clustered SEs differ only by the (nobs-1)/(nobs-k)
+    # finite-sample factor, as nobs (and the summary's log-likelihood and
+    # deviance) now refer to cells rather than person-months.
+    keys = [micro["is_parent"], periods["P2"], periods["P3"], micro["STATEFIP"], micro["MONTH"]]
+    agg = (
+        micro.groupby(keys, observed=True)["own_ill_absent"]
+        .agg(successes="sum", trials="count")
+        .reset_index()
+    )
+    agg["failures"] = agg["trials"] - agg["successes"]
+    X = _design_matrix(agg, ["STATEFIP", "MONTH"])
+    y = agg[["successes", "failures"]].astype(float)
+    return sm.GLM(y, X, family=sm.families.Binomial()).fit(
+        cov_type="cluster", cov_kwds={"groups": agg["STATEFIP"]}
+    )
+
+
 def run_person_glm(micro: pd.DataFrame) -> str:
     """Run GLM Binomial on person-month microdata (if available).
 
     Requires columns: own_ill_absent, is_parent, YEAR, MONTH, STATEFIP
     """
-    df = _make_periods(micro)
-    df["month_id"] = (df["YEAR"].astype(int) * 12 + df["MONTH"].astype(int))
-    model = smf.glm(
-        formula="own_ill_absent ~ is_parent * (P2 + P3) + C(STATEFIP) + C(MONTH)",
-        data=df,
-        family=sm.families.Binomial(),
-    ).fit(cov_type="cluster", cov_kwds={"groups": df["STATEFIP"]})
-    return model.summary().as_text()
+    return _fit_person_glm(micro).summary().as_text()
 
 
 def main() -> None:
@@ -12,19 +12,38 @@ Note: These tables are not parent-stratified; use as context only.
 
 from __future__ import annotations
 
+import re
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List
 
 import pandas as pd
 
+# Heuristic: the own-illness table is the one mentioning "illness" (case-insensitive).
+# The flag is inline because the lxml flavor passes only the pattern string to XPath.
+_ILLNESS_RE = re.compile(r"(?i)illness")
+
+BLS_URLS = [
+    "https://www.bls.gov/cps/cpsaat46.htm",
+    "https://www.bls.gov/cps/cpsaat47.htm",
+]
+
+
+def _mentions_illness(t: pd.DataFrame) -> bool:
+    # Column-wise vectorized substring search over cell values (not captions/notes)
+    hits = t.astype(str).apply(
+        lambda s: s.str.contains("illness", case=False, regex=False, na=False)
+    )
+    return bool(hits.to_numpy().any())
+
 
 def _extract_own_illness_from_tables(url: str) -> pd.DataFrame:
-    tables = pd.read_html(url)
-    # Heuristic: find a table containing "own illness" (case-insensitive)
-    matches: List[pd.DataFrame] = []
-    for t in tables:
-        if any(t.applymap(lambda x: isinstance(x, str) and ("illness" in x.lower())).any()):
-            matches.append(t)
+    # lxml parses in C; match= makes the parser skip unrelated tables entirely
+    try:
+        tables = pd.read_html(url, flavor="lxml", match=_ILLNESS_RE)
+    except ValueError:
+        tables = []
+    # match= also hits captions/footnotes, so confirm the mention is in a cell
+    matches = [t for t in tables if _mentions_illness(t)]
     if not matches:
         raise RuntimeError(f"Could not find own-illness table at {url}")
     # Use the first match; light cleanup
@@ -36,8 +55,9 @@ def _extract_own_illness_from_tables(url: str) -> pd.DataFrame:
 def main() -> None:
     out_dir = Path("data/processed")
     out_dir.mkdir(parents=True, exist_ok=True)
-    a46 = _extract_own_illness_from_tables("https://www.bls.gov/cps/cpsaat46.htm")
-    a47 = _extract_own_illness_from_tables("https://www.bls.gov/cps/cpsaat47.htm")
+    # Fetch both tables concurrently; each is dominated by network latency
+    with ThreadPoolExecutor(max_workers=len(BLS_URLS)) as ex:
+        a46, a47 = ex.map(_extract_own_illness_from_tables, BLS_URLS)
     # Save raw extracts for transparency
     a46.to_csv(out_dir / "bls_a46_raw.csv", index=False)
     a47.to_csv(out_dir / "bls_a47_raw.csv", index=False)
@@ -23,16 +23,23 @@ as parquet. For CI and unit tests, we DO NOT run this network step.
 
 from __future__ import annotations
 
+import hashlib
+import json
 import os
+import shutil
 import time
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Dict, List, Optional
 
 import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 import requests
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 IPUMS_API_BASE = "https://api.ipums.org"
 PROJECT = "cps"
@@ -60,11 +67,42 @@ IPUMS_VARS = [
     "POPLOC",
 ]
 
+# Bump whenever minimal_recode or DTYPES change so cached recoded extracts are rebuilt
+RECODE_VERSION = 1
+
+# Compact dtypes for recoded CPS codes (all small non-negative integers)
+DTYPES = {
+    "YEAR": "uint16",
+    "MONTH": "uint8",
+    "STATEFIP": "uint8",
+    "AGE": "uint8",
+    "SEX": "uint8",
+    "EDUC": "uint16",
+    "EMPSTAT": "uint8",
+    "ABSENT": "uint8",
+    "WHYABSNT": "uint8",
+    "NCHILD": "uint8",
+    "NCHLT5": "uint8",
+    "MOMLOC": "uint8",
+    "POPLOC": "uint8",
+}
+
 
 @dataclass
 class IpumsCpsClient:
     api_key: str
     out_dir: Path = Path("data/raw")
+    _session: requests.Session = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        # One keep-alive session for every API call so polls reuse the TLS
+        # connection; transient failures are retried with backoff (GETs only).
+        self._session = requests.Session()
+        self._session.headers.update(self._headers())
+        retry = Retry(total=5, backoff_factor=0.5, status_forcelist=(429, 500, 502, 503, 504))
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=4, max_retries=retry)
+        self._session.mount("https://", adapter)
+        self._session.mount("http://", adapter)
 
     def _headers(self) -> Dict[str, str]:
         return {"Authorization": f"Bearer {self.api_key}", "Accept": "application/json"}
@@ -89,17 +127,54 @@ class IpumsCpsClient:
         }
         return extract
 
+    @staticmethod
+    def _hash(obj: Dict) -> str:
+        return hashlib.sha1(json.dumps(obj, sort_keys=True).encode()).hexdigest()[:12]
+
+    def extract_key(self) -> str:
+        """Content hash of the extract request; keys the download progress sidecar."""
+        return self._hash(self._build_extract())
+
+    def cache_key(self) -> str:
+        """Content hash of the extract request and RECODE_VERSION; keys the recoded parquet."""
+        return self._hash({"extract": self._build_extract(), "recode_version": RECODE_VERSION})
+
+    def _state_path(self) -> Path:
+        # Recode changes reuse the downloaded zip, so the sidecar ignores RECODE_VERSION
+        return self.out_dir / f"cps_{self.extract_key()}.json"
+
+    def load_state(self) -> Dict:
+        """Progress sidecar (extract number, downloaded zip) for resuming runs."""
+        path = self._state_path()
+        return json.loads(path.read_text()) if path.exists() else {}
+
+    def save_state(self, state: Dict) -> None:
+        self._state_path().write_text(json.dumps(state, indent=2))
+
     def submit_extract(self) -> Dict:
         url = f"{IPUMS_API_BASE}/extracts/{PROJECT}"
-        resp = requests.post(url, json=self._build_extract(), headers=self._headers(), timeout=60)
+        resp = self._session.post(url, json=self._build_extract(), timeout=60)
         resp.raise_for_status()
         return resp.json()
 
-    def poll_extract(self, extract_number: int, wait_s: int = 10, timeout_s: int = 36000) -> Dict:
+    def poll_extract(
+        self,
+        extract_number: int,
+        wait_s: float = 5,
+        max_wait_s: float = 300,
+        timeout_s: int = 36000,
+    ) -> Dict:
+        """Poll until the extract completes, backing off exponentially.
+
+        The delay starts at wait_s and grows 1.7x per poll up to max_wait_s;
+        a numeric Retry-After header from the API takes precedence, clamped to
+        [wait_s, max_wait_s] so it can never turn polling into a busy loop.
+        """
         url = f"{IPUMS_API_BASE}/extracts/{PROJECT}/{extract_number}"
         start = time.time()
+        delay = wait_s
         while True:
-            r = requests.get(url, headers=self._headers(), timeout=30)
+            r = self._session.get(url, timeout=30)
             r.raise_for_status()
             js = r.json()
             status = js.get("status")
@@ -109,11 +184,17 @@ class IpumsCpsClient:
                 raise RuntimeError(f"Extract {extract_number} status={status}")
             if time.time() - start > timeout_s:
                 raise TimeoutError(f"Polling timed out for extract {extract_number}")
-            time.sleep(wait_s)
+            retry_after = r.headers.get("Retry-After", "")
+            if retry_after.isdigit():
+                # Honor the server's hint, clamped to [wait_s, max_wait_s]
+                time.sleep(max(wait_s, min(float(retry_after), max_wait_s)))
+            else:
+                time.sleep(delay)
+            delay = min(delay * 1.7, max_wait_s)
 
     def download_extract(self, extract_number: int) -> Path:
         url = f"{IPUMS_API_BASE}/extracts/{PROJECT}/{extract_number}/files"
-        r = requests.get(url, headers=self._headers(), timeout=60)
+        r = self._session.get(url, timeout=60)
         r.raise_for_status()
         files = r.json().get("files", [])
         if not files:
@@ -122,7 +203,7 @@ class IpumsCpsClient:
         dl_url = files[0]["downloadUrl"]
         self.out_dir.mkdir(parents=True, exist_ok=True)
         zip_path = self.out_dir / f"ipums_cps_{extract_number}.zip"
-        with requests.get(dl_url, headers=self._headers(), stream=True, timeout=300) as resp:
+        with self._session.get(dl_url, stream=True, timeout=300) as resp:
             resp.raise_for_status()
             with open(zip_path, "wb") as f:
                 for chunk in resp.iter_content(chunk_size=1 << 20):
@@ -130,16 +211,38 @@ class IpumsCpsClient:
                         f.write(chunk)
         return zip_path
 
-    def load_parquet_from_zip(self, zip_path: Path) -> pd.DataFrame:
+    def recode_zip_to_parquet(
+        self, zip_path: Path, out_path: Path, batch_size: int = 1 << 20
+    ) -> int:
+        """Stream the extract's parquet through minimal_recode into out_path.
+
+        Reads record batches of IPUMS_VARS so peak memory is bounded by
+        batch_size rows rather than the full extract. Returns rows written.
+        """
+        import tempfile
         import zipfile
 
-        with zipfile.ZipFile(zip_path) as zf:
+        with zipfile.ZipFile(zip_path) as zf, tempfile.TemporaryDirectory(dir=self.out_dir) as tmp:
             # Find parquet file inside
             members = [n for n in zf.namelist() if n.endswith(".parquet")]
             if not members:
                 raise RuntimeError("No parquet in downloaded ZIP")
-            with zf.open(members[0]) as f:
-                return pd.read_parquet(f)
+            # pyarrow needs a seekable file, so extract the member first
+            pf = pq.ParquetFile(zf.extract(members[0], path=tmp))
+            columns = [c for c in IPUMS_VARS if c in pf.schema_arrow.names]
+            # Output schema from recoding an empty frame, so the file exists (with
+            # the right columns) even for a zero-row extract, and every batch is
+            # pinned to it (nullable ints may come back as float per batch)
+            empty = self.minimal_recode(pf.schema_arrow.empty_table().select(columns).to_pandas())
+            schema = pa.Table.from_pandas(empty, preserve_index=False).schema
+            rows = 0
+            with pq.ParquetWriter(out_path, schema, compression="zstd") as writer:
+                for batch in pf.iter_batches(batch_size=batch_size, columns=columns):
+                    df = self.minimal_recode(batch.to_pandas())
+                    table = pa.Table.from_pandas(df, schema=schema, preserve_index=False)
+                    writer.write_table(table)
+                    rows += table.num_rows
+        return rows
 
     # --- Processing helpers ---
     @staticmethod
@@ -150,22 +253,61 @@ class IpumsCpsClient:
         to own illness/injury/medical codes in CPS. IPUMS codebook values for
         WHYABSNT define which codes are own illness/injury. Commonly code 10 (own illness).
         """
-        for c in ["YEAR", "MONTH", "STATEFIP", "AGE", "SEX", "EDUC", "EMPSTAT"]:
-            if c in df.columns:
-                df[c] = pd.to_numeric(df[c], errors="coerce").astype("Int64")
-        # boolean parent helper
-        for c in ["NCHILD", "NCHLT5", "MOMLOC", "POPLOC", "ABSENT", "WHYABSNT"]:
+        # Downcast to compact unsigned ints; missing/unparseable codes become 0
+        for c, dt in DTYPES.items():
             if c in df.columns:
-                df[c] = pd.to_numeric(df[c], errors="coerce").astype("Int64")
+                df[c] = pd.to_numeric(df[c], errors="coerce").fillna(0).astype(dt)
 
         # own illness: ABSENT==1 and WHYABSNT == own illness (commonly 10)
-        own_ill_codes = {10}
-        df["own_ill_absent"] = (
-            (df["ABSENT"].fillna(0) == 1) & (df["WHYABSNT"].isin(list(own_ill_codes)))
-        ).astype(int)
+        absent = df["ABSENT"].to_numpy()
+        why = df["WHYABSNT"].to_numpy()
+        df["own_ill_absent"] = ((absent == 1) & (why == 10)).astype(np.uint8)
         return df
 
 
+def _link_output(cached: Path, out_path: Path) -> None:
+    """Point out_path at the cached parquet via a hard link (no second copy on disk)."""
+    if out_path.exists() and out_path.samefile(cached):
+        return
+    out_path.unlink(missing_ok=True)
+    try:
+        os.link(cached, out_path)
+    except OSError:
+        # Filesystem without hard links: fall back to copying
+        shutil.copyfile(cached, out_path)
+
+
+def _fetch_extract_zip(client: IpumsCpsClient) -> Path:
+    """Submit, poll and download the extract, resuming from the progress sidecar.
+
+    Each step is recorded so an interrupted run resumes where it stopped. If the
+    recorded extract failed, was canceled or its files expired, the sidecar entry
+    is dropped before re-raising so the next run submits a fresh extract.
+    """
+    state = client.load_state()
+    extract_number = state.get("extract_number")
+    if not extract_number:
+        submit = client.submit_extract()
+        extract_number = submit.get("number") or submit.get("extractNumber")
+        if not extract_number:
+            raise RuntimeError(f"Unexpected submit response: {submit}")
+        state["extract_number"] = int(extract_number)
+        client.save_state(state)
+    zip_path = Path(state["zip_path"]) if "zip_path" in state else None
+    if zip_path is None or not zip_path.exists():
+        try:
+            client.poll_extract(int(extract_number))
+            zip_path = client.download_extract(int(extract_number))
+        except RuntimeError:
+            state.pop("extract_number", None)
+            state.pop("zip_path", None)
+            client.save_state(state)
+            raise
+        state["zip_path"] = str(zip_path)
+        client.save_state(state)
+    return zip_path
+
+
 def main() -> None:
     load_dotenv()
     api_key = os.getenv("IPUMS_API_KEY")
@@ -175,18 +317,20 @@ def main() -> None:
         raise SystemExit("Missing IPUMS_API_KEY in .env")
 
     client = IpumsCpsClient(api_key=api_key, out_dir=out_dir)
-    # Submit, poll, download, load, minimal recode, save
-    submit = client.submit_extract()
-    extract_number = submit.get("number") or submit.get("extractNumber")
-    if not extract_number:
-        raise RuntimeError(f"Unexpected submit response: {submit}")
-    client.poll_extract(int(extract_number))
-    zip_path = client.download_extract(int(extract_number))
-    df = client.load_parquet_from_zip(zip_path)
-    df = client.minimal_recode(df)
     out_path = Path("data/raw/cps.parquet")
-    df.to_parquet(out_path)
-    print(f"Wrote {out_path} with {len(df):,} rows")
+    cached = out_dir / f"cps_{client.cache_key()}.parquet"
+    if cached.exists():
+        _link_output(cached, out_path)
+        print(f"Linked {out_path} to cached {cached.name}")
+        return
+
+    zip_path = _fetch_extract_zip(client)
+    # Write under a temp name so a partial file is never mistaken for the cache
+    partial = cached.with_suffix(".parquet.part")
+    rows = client.recode_zip_to_parquet(zip_path, partial)
+    partial.replace(cached)
+    _link_output(cached, out_path)
+    print(f"Wrote {out_path} with {rows:,} rows")
 
 
 if __name__ == "__main__":
@@ -13,29 +13,62 @@ from pathlib import Path
 
 import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+# Columns needed to build flags and rates from the raw CPS extract
+RAW_COLUMNS = ["YEAR", "MONTH", "NCHILD", "MOMLOC", "POPLOC", "NCHLT5", "own_ill_absent"]
+
+# Analysis sample: employed civilians (EMPSTAT 10/12) aged 25–49
+SAMPLE_FILTER = (
+    ds.field("EMPSTAT").isin([10, 12]) & (ds.field("AGE") >= 25) & (ds.field("AGE") <= 49)
+)
+
+
+def _positive(df: pd.DataFrame, col: str) -> np.ndarray:
+    # Missing codes count as zero; compare on the raw ndarray, no temp Series
+    return df[col].to_numpy(dtype="float32", na_value=0.0) > 0
 
 
 def make_parent_flags(df: pd.DataFrame) -> pd.DataFrame:
-    df = df.copy()
+    """Add is_parent and has_child_u5 (int8) to df in place and return it."""
     # co-resident child presence
-    nch = pd.to_numeric(df.get("NCHILD"), errors="coerce").fillna(0)
-    momloc = pd.to_numeric(df.get("MOMLOC"), errors="coerce").fillna(0)
-    poploc = pd.to_numeric(df.get("POPLOC"), errors="coerce").fillna(0)
-    nclt5 = pd.to_numeric(df.get("NCHLT5"), errors="coerce").fillna(0)
-
-    df["is_parent"] = ((nch > 0) | (momloc > 0) | (poploc > 0)).astype(int)
-    df["has_child_u5"] = (nclt5 > 0).astype(int)
+    is_parent = _positive(df, "NCHILD") | _positive(df, "MOMLOC") | _positive(df, "POPLOC")
+    df["is_parent"] = is_parent.astype(np.int8)
+    df["has_child_u5"] = _positive(df, "NCHLT5").astype(np.int8)
     return df
 
 
+def _load_sample(path: Path) -> pd.DataFrame:
+    """Scan only RAW_COLUMNS for the analysis sample, filtered in Arrow's scanner."""
+    return ds.dataset(path).to_table(columns=RAW_COLUMNS, filter=SAMPLE_FILTER).to_pandas()
+
+
 def _aggregate_monthly_rates(df: pd.DataFrame) -> pd.DataFrame:
-    # Restrict to civilians 25–49 who are employed
-    emp = pd.to_numeric(df.get("EMPSTAT"), errors="coerce").fillna(0)
-    age = pd.to_numeric(df.get("AGE"), errors="coerce").fillna(0)
-    keep = (emp.isin([10, 12])) & (age.between(25, 49))
-    g = df.loc[keep].groupby(["YEAR", "MONTH", "is_parent"], as_index=False)
-    out = g["own_ill_absent"].mean().rename(columns={"own_ill_absent": "rate"})
-    return out.astype({"YEAR": int, "MONTH": int, "is_parent": int})
+    """Own-illness absence rate by YEAR, MONTH, is_parent.
+
+    Expects the analysis sample already restricted by SAMPLE_FILTER (see _load_sample).
+    """
+    # Group means over a composite (YEAR, MONTH, is_parent) integer key:
+    # one pass accumulates sums/counts into a dense buffer, no sort needed.
+    key = (
+        df["YEAR"].to_numpy().astype(np.int32) * 32
+        + df["MONTH"].to_numpy().astype(np.int32) * 2
+        + df["is_parent"].to_numpy().astype(np.int32)
+    )
+    counts = np.bincount(key)
+    sums = np.bincount(key, weights=df["own_ill_absent"].to_numpy(), minlength=len(counts))
+    cells = np.flatnonzero(counts)
+    sums, counts = sums[cells], counts[cells]
+    return pd.DataFrame(
+        {
+            "YEAR": cells // 32,
+            "MONTH": (cells % 32) // 2,
+            "is_parent": cells % 2,
+            "rate": sums / counts,
+        }
+    ).astype({"YEAR": int, "MONTH": int, "is_parent": int, "rate": np.float32})
 
 
 def main() -> None:
@@ -43,12 +76,18 @@ def main() -> None:
     if not raw.exists():
         print("data/raw/cps.parquet not found; run `make ipums` first.")
         return
-    df = pd.read_parquet(raw)
+    df = _load_sample(raw)
     df = make_parent_flags(df)
     rates = _aggregate_monthly_rates(df)
     out = Path("data/processed")
     out.mkdir(parents=True, exist_ok=True)
-    rates.to_parquet(out / "cps_absence_rates.parquet")
+    pq.write_table(
+        pa.Table.from_pandas(rates, preserve_index=False),
+        out / "cps_absence_rates.parquet",
+        compression="zstd",
+        compression_level=5,
+        use_dictionary=True,
+    )
     print("Wrote data/processed/cps_absence_rates.parquet")
 
 
@@ -11,17 +11,31 @@ from __future__ import annotations
 
 from pathlib import Path
 
-import matplotlib.pyplot as plt
-import pandas as pd
+import matplotlib
+
+# Headless Agg backend: bind before pyplot import so no GUI toolkit is probed
+matplotlib.use("Agg")
+
+import matplotlib.pyplot as plt  # noqa: E402
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+# PNG output: 100 dpi with Pillow's optimized encoder for smaller report images
+SAVEFIG_KW = {"dpi": 100, "pil_kwargs": {"optimize": True}}
 
 
 def _load_rates() -> pd.DataFrame:
+    """Load monthly rates as a date-sorted wide frame (columns: is_parent 0/1)."""
     path = Path("data/processed/cps_absence_rates.parquet")
     if not path.exists():
         raise FileNotFoundError("data/processed/cps_absence_rates.parquet not found")
-    df = pd.read_parquet(path)
-    df["date"] = pd.to_datetime(df["YEAR"].astype(int).astype(str) + "-" + df["MONTH"].astype(int).astype(str) + "-01")
-    return df
+    df = pd.read_parquet(path, columns=["YEAR", "MONTH", "is_parent", "rate"])
+    # Month offsets from the epoch instead of formatting and parsing date strings
+    year = df["YEAR"].to_numpy(dtype=np.int64)
+    month = df["MONTH"].to_numpy(dtype=np.int64)
+    months = (year - 1970) * 12 + (month - 1)
+    df["date"] = (np.datetime64("1970-01", "M") + months).astype("datetime64[ns]")
+    return df.pivot_table(index="date", columns="is_parent", values="rate").sort_index()
 
 
 def _period_bands(ax):
@@ -30,36 +44,38 @@ def _period_bands(ax):
     ax.axvspan(pd.Timestamp("2020-01-01"), pd.Timestamp("2035-01-01"), color="#999999", alpha=0.08)
 
 
-def plot_timeseries(df: pd.DataFrame, out_dir: Path) -> Path:
-    fig, ax = plt.subplots(figsize=(10, 5))
-    p = df[df["is_parent"] == 1].sort_values("date")
-    np_ = df[df["is_parent"] == 0].sort_values("date")
-    ax.plot(p["date"], p["rate"], label="Parents", lw=1.5)
-    ax.plot(np_["date"], np_["rate"], label="Non-parents", lw=1.5)
+def _reset_axes(ax: plt.Axes, figsize: tuple[float, float]) -> plt.Figure:
+    # Reuse the caller's figure: clear the axes and resize instead of reallocating
+    ax.clear()
+    fig = ax.figure
+    fig.set_size_inches(*figsize)
+    return fig
+
+
+def plot_timeseries(wide: pd.DataFrame, out_dir: Path, ax: plt.Axes) -> Path:
+    fig = _reset_axes(ax, (10, 5))
+    ax.plot(wide.index, wide[1], label="Parents", lw=1.5)
+    ax.plot(wide.index, wide[0], label="Non-parents", lw=1.5)
     _period_bands(ax)
     ax.set_title("Own-illness absence rates (25–49, employed)")
     ax.set_ylabel("Rate")
     ax.legend()
     out = out_dir / "parents_vs_nonparents.png"
     fig.tight_layout()
-    fig.savefig(out, dpi=150)
-    plt.close(fig)
+    fig.savefig(out, **SAVEFIG_KW)
     return out
 
 
-def plot_gap(df: pd.DataFrame, out_dir: Path) -> Path:
-    wide = df.pivot_table(index="date", columns="is_parent", values="rate")
-    wide.columns = ["non_parent" if c == 0 else "parent" for c in wide.columns]
-    wide["gap"] = wide["parent"] - wide["non_parent"]
-    fig, ax = plt.subplots(figsize=(10, 4))
-    ax.plot(wide.index, wide["gap"], color="#b0413e", lw=1.5)
+def plot_gap(wide: pd.DataFrame, out_dir: Path, ax: plt.Axes) -> Path:
+    gap = wide[1] - wide[0]
+    fig = _reset_axes(ax, (10, 4))
+    ax.plot(wide.index, gap, color="#b0413e", lw=1.5)
     _period_bands(ax)
     ax.set_title("Gap: Parents minus Non-parents (own-illness absence)")
     ax.set_ylabel("Percentage points")
     out = out_dir / "gap_timeseries.png"
     fig.tight_layout()
-    fig.savefig(out, dpi=150)
-    plt.close(fig)
+    fig.savefig(out, **SAVEFIG_KW)
     return out
 
 
@@ -73,10 +89,15 @@ def _write_index_html(out_dir: Path, images: list[Path]) -> None:
 
 
 def main() -> None:
-    df = _load_rates()
+    wide = _load_rates()
     out = Path("figures")
     out.mkdir(parents=True, exist_ok=True)
-    imgs = [plot_timeseries(df, out), plot_gap(df, out)]
+    # One figure shared by all plots; each plotter clears the axes first
+    fig, ax = plt.subplots(figsize=(10, 5))
+    try:
+        imgs = [plot_timeseries(wide, out, ax), plot_gap(wide, out, ax)]
+    finally:
+        plt.close(fig)
     _write_index_html(out, imgs)
     print("Wrote figures/ and figures/index.html")
 
@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+import statsmodels.api as sm
+import statsmodels.formula.api as smf
+
+from src.analysis.did_model import _design_matrix, _fit_person_glm, _make_periods
+
+
+def _rates() -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(
+        [(y, m, p) for y in range(2000, 2024) for m in range(1, 13) for p in (0, 1)],
+        columns=["YEAR", "MONTH", "is_parent"],
+    )
+    df["rate"] = 0.01 + 0.002 * df["is_parent"] + rng.normal(0, 0.001, len(df))
+    return pd.concat([df, _make_periods(df)], axis=1)
+
+
+def test_design_matrix_matches_formula_ols():
+    df = _rates()
+    got = sm.OLS(df["rate"], _design_matrix(df, ["MONTH"])).fit()
+    want = smf.ols("rate ~ is_parent * (P2 + P3) + C(MONTH)", data=df).fit()
+    assert set(got.params.index) == set(want.params.index)
+    pd.testing.assert_series_equal(
+        got.params.sort_index(), want.params.sort_index(), check_exact=False, rtol=1e-8
+    )
+
+
+def test_make_periods_boundaries():
+    years = pd.DataFrame({"YEAR": [1993, 1994, 2007, 2008, 2019, 2020, np.nan]})
+    got = _make_periods(years)
+    assert got["P1"].tolist() == [0, 1, 1, 0, 0, 0, 0]
+    assert got["P2"].tolist() == [0, 0, 0, 1, 1, 0, 0]
+    assert got["P3"].tolist() == [0, 0, 0, 0, 0, 1, 0]
+    assert got.index.equals(years.index)
+
+
+def test_person_glm_matches_micro_fit():
+    rng = np.random.default_rng(1)
+    n = 20000
+    micro = pd.DataFrame(
+        {
+            "YEAR": rng.integers(1994, 2026, n),
+            "MONTH": rng.integers(1, 13, n),
+            "STATEFIP": rng.choice([1, 6, 17, 36, 48], n),
+            "is_parent": rng.integers(0, 2, n),
+        }
+    )
+    micro["own_ill_absent"] = (rng.random(n) < 0.05 + 0.02 * micro["is_parent"]).astype("uint8")
+
+    got = _fit_person_glm(micro).params
+    df = pd.concat([micro, _make_periods(micro)], axis=1)
+    want = smf.glm(
+        "own_ill_absent ~ is_parent * (P2 + P3) + C(STATEFIP) + C(MONTH)",
+        data=df,
+        family=sm.families.Binomial(),
+    ).fit()
+    assert set(got.index) == set(want.params.index)
+    pd.testing.assert_series_equal(
+        got.sort_index(), want.params.sort_index(), check_exact=False, rtol=1e-6
+    )
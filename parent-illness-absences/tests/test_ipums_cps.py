@@ -0,0 +1,81 @@
+import pytest
+
+from src.data.ipums_cps import IpumsCpsClient, _fetch_extract_zip
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    """Client whose network calls are stubbed and recorded in client.calls."""
+    c = IpumsCpsClient(api_key="test", out_dir=tmp_path)
+    c.calls = []
+
+    def submit():
+        c.calls.append("submit")
+        return {"number": 7}
+
+    def download(n):
+        c.calls.append(("download", n))
+        zip_path = tmp_path / f"ipums_cps_{n}.zip"
+        zip_path.write_bytes(b"zip")
+        return zip_path
+
+    monkeypatch.setattr(c, "submit_extract", submit)
+    monkeypatch.setattr(c, "poll_extract", lambda n: c.calls.append(("poll", n)))
+    monkeypatch.setattr(c, "download_extract", download)
+    return c
+
+
+def test_resume_skips_submit_and_download(client):
+    zip_path = _fetch_extract_zip(client)
+    assert client.calls == ["submit", ("poll", 7), ("download", 7)]
+    assert client.load_state() == {"extract_number": 7, "zip_path": str(zip_path)}
+
+    client.calls.clear()
+    assert _fetch_extract_zip(client) == zip_path
+    assert client.calls == []
+
+
+def test_resume_polls_recorded_extract_without_resubmitting(client):
+    client.save_state({"extract_number": 5})
+    _fetch_extract_zip(client)
+    assert client.calls == [("poll", 5), ("download", 5)]
+
+
+def test_failed_extract_is_dropped_from_state(client, monkeypatch):
+    client.save_state({"extract_number": 5})
+
+    def failed(n):
+        raise RuntimeError(f"Extract {n} status=failed")
+
+    monkeypatch.setattr(client, "poll_extract", failed)
+    with pytest.raises(RuntimeError, match="status=failed"):
+        _fetch_extract_zip(client)
+    assert client.load_state() == {}
+
+    # The next run submits a fresh extract instead of re-polling the failed one
+    monkeypatch.setattr(client, "poll_extract", lambda n: client.calls.append(("poll", n)))
+    _fetch_extract_zip(client)
+    assert client.calls == ["submit", ("poll", 7), ("download", 7)]
+
+
+def test_poll_clamps_retry_after(tmp_path, monkeypatch):
+    class Resp:
+        def __init__(self, status, retry_after=None):
+            self.status = status
+            self.headers = {} if retry_after is None else {"Retry-After": retry_after}
+
+        def raise_for_status(self):
+            pass
+
+        def json(self):
+            return {"status": self.status}
+
+    c = IpumsCpsClient(api_key="test", out_dir=tmp_path)
+    responses = iter(
+        [Resp("queued", "0"), Resp("queued", "9999"), Resp("queued"), Resp("completed")]
+    )
+    sleeps = []
+    monkeypatch.setattr(c._session, "get", lambda *a, **kw: next(responses))
+    monkeypatch.setattr("src.data.ipums_cps.time.sleep", sleeps.append)
+    assert c.poll_extract(1, wait_s=5, max_wait_s=60)["status"] == "completed"
+    assert sleeps == [5, 60, pytest.approx(5 * 1.7 * 1.7)]
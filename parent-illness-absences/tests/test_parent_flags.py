@@ -0,0 +1,27 @@
+import numpy as np
+import pandas as pd
+
+from src.features.parent_flags import _aggregate_monthly_rates
+
+
+def test_aggregate_matches_groupby_mean():
+    rng = np.random.default_rng(0)
+    n = 5000
+    df = pd.DataFrame(
+        {
+            "YEAR": rng.integers(1994, 2026, n).astype("uint16"),
+            # 0 is the recoded missing month; it must not collide with a neighbouring year
+            "MONTH": rng.integers(0, 13, n).astype("uint8"),
+            "is_parent": rng.integers(0, 2, n).astype("int8"),
+            "own_ill_absent": (rng.random(n) < 0.2).astype("uint8"),
+        }
+    )
+    got = _aggregate_monthly_rates(df)
+    want = (
+        df.groupby(["YEAR", "MONTH", "is_parent"], as_index=False)["own_ill_absent"]
+        .mean()
+        .rename(columns={"own_ill_absent": "rate"})
+        .astype({"YEAR": int, "MONTH": int, "is_parent": int, "rate": np.float32})
+    )
+    assert (got["MONTH"] == 0).any()
+    pd.testing.assert_frame_equal(got, want)